@@ -0,0 +1,36 @@
+# --- Shared FBref configuration for the scraper scripts ---
+# Single source of truth for the season, page URLs, table ids, and the
+# FBref -> Fantrax column mapping used by fbrefscraper.py and
+# check-fbref-columns.py.
+
+SEASON = "2024-2025"
+
+URLS = {
+    "standard": f"https://fbref.com/en/comps/9/{SEASON}/stats/{SEASON}-Premier-League-Stats",
+    "shooting": f"https://fbref.com/en/comps/9/{SEASON}/shooting/{SEASON}-Premier-League-Stats",
+    "passing": f"https://fbref.com/en/comps/9/{SEASON}/passing/{SEASON}-Premier-League-Stats",
+    "defense": f"https://fbref.com/en/comps/9/{SEASON}/defense/{SEASON}-Premier-League-Stats",
+    "possession": f"https://fbref.com/en/comps/9/{SEASON}/possession/{SEASON}-Premier-League-Stats",
+    "goalkeeping": f"https://fbref.com/en/comps/9/{SEASON}/keepers/{SEASON}-Premier-League-Stats"
+}
+
+TABLE_IDS = {
+    "standard": "stats_standard",
+    "shooting": "stats_shooting",
+    "passing": "stats_passing",
+    "defense": "stats_defense",
+    "possession": "stats_possession",
+    "goalkeeping": "stats_keeper"
+}
+
+COLUMN_MAP = {
+    'Player': 'name', 'Pos': 'position', 'Squad': 'team', 'Age': 'age', 'Min': 'minutes', 'Gls': 'goals', 'Ast': 'assists',
+    'Sh': 'shots', 'SoT': 'shotsOnTarget', 'KP': 'keyPasses', 'TklW': 'tacklesWon', 'Int': 'interceptions',
+    'Succ': 'dribbles', 'Crs': 'accCrosses', 'Fls': 'foulsCommitted', 'Fld': 'foulsSuffered', 'Off': 'offsides',
+    'PKmiss': 'pkMissed', 'PKwon': 'pkDrawn', 'OG': 'ownGoals', 'Disp': 'dispossessed', 'Recov': 'recoveries',
+    'Won': 'aerialsWon', 'Blocks': 'blockedShots', 'Clr': 'clearances', 'CrdY': 'yellowCards', 'CrdR': 'redCards',
+    # Goalkeeping stats
+    'Saves': 'saves', 'PKsv': 'pkSaves', 'Crosses': 'highClaims', 'GA': 'goalsConceded',
+    # Clean sheets (calculated from standard stats)
+    'CS': 'cleanSheets'
+}
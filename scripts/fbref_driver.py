@@ -0,0 +1,34 @@
+# --- Shared headless Chrome driver for the FBref scraper scripts ---
+# Chrome cold start costs several seconds and ~300MB RSS, so code that has to
+# fall back to Selenium attaches to one module-level driver instead of every
+# caller spawning (and tearing down) its own.
+
+import atexit
+import threading
+
+import undetected_chromedriver as uc
+
+_driver = None
+_driver_lock = threading.Lock()
+
+def get_driver():
+    """Returns the shared headless driver, creating it on first use.
+
+    The driver is quit automatically at interpreter exit. Callers that can
+    run concurrently must serialize their navigation themselves; Chrome
+    renders one page at a time per driver."""
+    global _driver
+    with _driver_lock:
+        if _driver is None:
+            # Headless with images disabled - the stat tables are plain HTML
+            options = uc.ChromeOptions()
+            options.add_argument("--headless=new")
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            _driver = uc.Chrome(options=options, use_subprocess=True)
+            _driver.execute_cdp_cmd('Network.enable', {})
+            _driver.execute_cdp_cmd('Network.setBlockedURLs', {
+                'urls': ['*.png', '*.jpg', '*.gif', '*googletagmanager*', '*doubleclick*']
+            })
+            atexit.register(_driver.quit)
+        return _driver
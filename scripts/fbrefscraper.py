@@ -1,75 +1,120 @@
+import argparse
+import os
+import pathlib
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
-import json
+import re
+import requests
 import time
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-import undetected_chromedriver as uc
+try:
+    import orjson  # C-based JSON, much faster than stdlib for multi-MB dumps
+except ImportError:
+    orjson = None
+    import json
+
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from fbref_config import SEASON, URLS, TABLE_IDS, COLUMN_MAP
+from fbref_driver import get_driver
+
 # --- Configuration ---
-SEASON = "2024-2025"
 MAX_RETRIES = 3 # <<-- Number of times to retry a failed request
 RETRY_DELAY = 5 # <<-- Seconds to wait between retries
+MAX_CONCURRENT_FETCHES = 6 # <<-- Tables fetched in parallel (one per stat page; plain GETs are cheap)
+CACHE_DIR = pathlib.Path("cache") # <<-- Fetched pages are cached here so retries don't re-download
+CACHE_MAX_AGE = 24 * 60 * 60 # <<-- Seconds before a cached page is considered stale
 
-URLS = {
-    "standard": f"https://fbref.com/en/comps/9/{SEASON}/stats/{SEASON}-Premier-League-Stats",
-    "shooting": f"https://fbref.com/en/comps/9/{SEASON}/shooting/{SEASON}-Premier-League-Stats",
-    "passing": f"https://fbref.com/en/comps/9/{SEASON}/passing/{SEASON}-Premier-League-Stats",
-    "defense": f"https://fbref.com/en/comps/9/{SEASON}/defense/{SEASON}-Premier-League-Stats",
-    "possession": f"https://fbref.com/en/comps/9/{SEASON}/possession/{SEASON}-Premier-League-Stats",
-    "goalkeeping": f"https://fbref.com/en/comps/9/{SEASON}/keepers/{SEASON}-Premier-League-Stats"
-}
+# FBref wraps most stat tables in HTML comments; stripping the markers in one
+# pass exposes them to the parser (compiled once, reused per page)
+COMMENT_MARKER_RE = re.compile(r'<!--|-->')
 
-TABLE_IDS = {
-    "standard": "stats_standard",
-    "shooting": "stats_shooting",
-    "passing": "stats_passing",
-    "defense": "stats_defense",
-    "possession": "stats_possession",
-    "goalkeeping": "stats_keeper"
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
 }
 
-COLUMN_MAP = {
-    'Player': 'name', 'Pos': 'position', 'Squad': 'team', 'Age': 'age', 'Min': 'minutes', 'Gls': 'goals', 'Ast': 'assists',
-    'Sh': 'shots', 'SoT': 'shotsOnTarget', 'KP': 'keyPasses', 'TklW': 'tacklesWon', 'Int': 'interceptions',
-    'Succ': 'dribbles', 'Crs': 'accCrosses', 'Fls': 'foulsCommitted', 'Fld': 'foulsSuffered', 'Off': 'offsides',
-    'PKmiss': 'pkMissed', 'PKwon': 'pkDrawn', 'OG': 'ownGoals', 'Disp': 'dispossessed', 'Recov': 'recoveries',
-    'Won': 'aerialsWon', 'Blocks': 'blockedShots', 'Clr': 'clearances', 'CrdY': 'yellowCards', 'CrdR': 'redCards',
-    # Goalkeeping stats
-    'Saves': 'saves', 'PKsv': 'pkSaves', 'Crosses': 'highClaims', 'GA': 'goalsConceded',
-    # Clean sheets (calculated from standard stats)
-    'CS': 'cleanSheets'
-}
+def make_session():
+    """Builds a requests.Session with keep-alive pooling, a browser-like UA,
+    and exponential-backoff retries for transient HTTP failures."""
+    # Retrying 429/5xx at the HTTP layer means one GET call absorbs transient
+    # errors with backoff; the app-level loop only handles parse failures
+    retry = Retry(total=MAX_RETRIES, backoff_factor=1.5,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']))
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    session.mount("https://", HTTPAdapter(pool_connections=MAX_CONCURRENT_FETCHES,
+                                          pool_maxsize=MAX_CONCURRENT_FETCHES,
+                                          max_retries=retry))
+    return session
+
+# The shared driver renders one page at a time, so fallback fetches from
+# concurrent workers take turns
+BROWSER_LOCK = threading.Lock()
+
+def load_page_with_browser(url, table_id):
+    """Last-resort fetch through the shared headless browser for when FBref
+    rejects plain HTTP clients (see fbref_driver)."""
+    with BROWSER_LOCK:
+        driver = get_driver()
+        driver.get(url)
+        # Wait for an actual data cell rather than sleeping a fixed 5s; the wait
+        # returns as soon as the table body is populated, even on slow connections
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, f"#{table_id} tbody tr td"))
+        )
+        return driver.page_source
+
+def load_page(session, url, table_id):
+    """Loads a stats page (or reuses a fresh cached copy) and returns its HTML."""
+    # Season-qualified key so a SEASON bump never serves last season's cache
+    cache_file = CACHE_DIR / f"{table_id}-{SEASON}.html"
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < CACHE_MAX_AGE:
+        print(f"\nUsing cached page for table '{table_id}'...")
+        return cache_file.read_text()
 
-def get_table_as_df(driver, url, table_id):
-    """Navigates to a specific URL and parses the table. Throws an exception on failure."""
     print(f"\nAttempting to fetch table '{table_id}' from {url}...")
-    
-    driver.get(url)
-    # Increased sleep to ensure JS has time to fire, even on slow connections
-    time.sleep(5)
 
-    # Increased timeout for more patience
-    WebDriverWait(driver, 30).until(
-        EC.visibility_of_element_located((By.ID, table_id))
-    )
-    
-    page_source = driver.page_source
-    soup = BeautifulSoup(page_source.replace("", ""), 'lxml')
-    
-    table = soup.find('table', id=table_id)
+    # FBref stat pages are server-rendered, so a plain GET is enough; no
+    # Chromium render (and its ~5-10s page load) on the happy path
+    try:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        page_source = response.text
+    except requests.RequestException as e:
+        print(f"Plain HTTP fetch failed for '{table_id}' ({e}). Falling back to browser...")
+        page_source = load_page_with_browser(url, table_id)
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    cache_file.write_text(page_source)
+    return page_source
+
+def parse_table(page_source, table_id):
+    """Parses the table out of already-loaded HTML. Throws an exception on failure."""
+    # Uncomment the stat tables (see COMMENT_MARKER_RE) so a plain GET parses
+    page_source = COMMENT_MARKER_RE.sub('', page_source)
+    # One lxml parse of the page; no BeautifulSoup DOM + pandas.read_html re-parse
+    table = lxml_html.fromstring(page_source).get_element_by_id(table_id, None)
     if table is None:
         # This will trigger the retry logic if the table isn't found
         raise ValueError(f"Could not find table with id '{table_id}' in the page source.")
 
-    df = pd.read_html(StringIO(str(table)), flavor='lxml')[0]
-    
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(1)
-        
+    # The last <thead> row holds the actual stat names (the first is the grouping row)
+    header = [cell.text_content().strip() for cell in table.xpath('.//thead/tr[last()]/th')]
+    rows = [
+        [cell.text_content().strip() for cell in tr.xpath('./th|./td')]
+        for tr in table.xpath('.//tbody/tr')
+    ]
+    df = pd.DataFrame([row for row in rows if len(row) == len(header)], columns=header)
+
     df = df.loc[:,~df.columns.duplicated()]
     df = df[df['Player'] != 'Player'].reset_index(drop=True)
 
@@ -90,37 +135,47 @@ def calculate_clean_sheets(standard_df):
         print("Warning: Clean sheets not found in data. Setting to 0.")
         return pd.Series([0] * len(standard_df))
 
+def fetch_table(session, url, table_id):
+    """Fetches one table, retrying on failure.
+
+    Runs in a worker thread; requests releases the GIL while waiting on the
+    network, so several fetches overlap their latency."""
+    page_source = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            if page_source is None:
+                page_source = load_page(session, url, table_id)
+            # Retries after a parse failure reuse the already-loaded HTML
+            return parse_table(page_source, table_id)
+        except Exception as e:
+            print(f"Attempt {attempt + 1} of {MAX_RETRIES} failed for table '{table_id}'. Error: {e}")
+            if attempt + 1 == MAX_RETRIES:
+                print(f"All retries failed for table '{table_id}'. Skipping.")
+                return pd.DataFrame() # Empty dataframe on final failure
+            else:
+                print(f"Retrying in {RETRY_DELAY} seconds...")
+                time.sleep(RETRY_DELAY)
+
 def main():
-    print("Initializing browser...")
-    options = uc.ChromeOptions()
-    options.add_argument("--start-maximized")
-    driver = uc.Chrome(options=options, use_subprocess=True)
+    parser = argparse.ArgumentParser(description="Scrape FBref Premier League stats into fpl-data JSON")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached pages and re-download everything")
+    args = parser.parse_args()
+
+    if args.refresh:
+        for cache_file in CACHE_DIR.glob("*.html"):
+            cache_file.unlink()
 
+    print(f"Fetching {len(URLS)} tables with up to {MAX_CONCURRENT_FETCHES} concurrent requests...")
+    session = make_session()
     dataframes = {}
-    try:
-        for stat_type, url in URLS.items():
-            table_id = TABLE_IDS[stat_type]
-            
-            # --- NEW: RETRY LOGIC ---
-            for attempt in range(MAX_RETRIES):
-                try:
-                    df = get_table_as_df(driver, url, table_id)
-                    dataframes[stat_type] = df
-                    # If successful, break the retry loop and move to the next URL
-                    break
-                except Exception as e:
-                    print(f"Attempt {attempt + 1} of {MAX_RETRIES} failed for table '{table_id}'. Error: {e}")
-                    if attempt + 1 == MAX_RETRIES:
-                        print(f"All retries failed for table '{table_id}'. Skipping.")
-                        dataframes[stat_type] = pd.DataFrame() # Assign empty dataframe on final failure
-                    else:
-                        print(f"Retrying in {RETRY_DELAY} seconds...")
-                        time.sleep(RETRY_DELAY)
-            
-            time.sleep(2) # Brief pause between different page requests
-    finally:
-        print("\nClosing browser.")
-        driver.quit()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        futures = {
+            executor.submit(fetch_table, session, url, TABLE_IDS[stat_type]): stat_type
+            for stat_type, url in URLS.items()
+        }
+        for future in as_completed(futures):
+            dataframes[futures[future]] = future.result()
 
     # The rest of the script (merging and saving) remains the same
     print("Merging dataframes...")
@@ -128,68 +183,81 @@ def main():
         print("\n❌ Could not fetch the essential 'standard' stats. Aborting merge.")
         return
         
-    merged_df = dataframes["standard"]
-
     merge_keys = ['Player', 'Squad']
-    for name, df in dataframes.items():
-        if name == "standard" or df.empty: continue
-        
-        unique_cols = [col for col in df.columns if col not in merged_df.columns]
-        merged_df = pd.merge(merged_df, df[merge_keys + unique_cols], on=merge_keys, how='left', suffixes=('', '_drop'))
-        merged_df.drop([col for col in merged_df.columns if 'drop' in col], axis=1, inplace=True)
+    frames = []
+    seen_cols = set(merge_keys)
+    for name in URLS: # URLS order keeps 'standard' first so column order is stable
+        df = dataframes.get(name, pd.DataFrame())
+        if df.empty: continue
+
+        unique_cols = [col for col in df.columns if col not in seen_cols]
+        seen_cols.update(unique_cols)
+        frames.append(df.set_index(merge_keys)[unique_cols])
+
+    # One indexed concat instead of five chained merges with suffix cleanup;
+    # reindexing on the standard frame keeps the old left-join semantics
+    merged_df = pd.concat(frames, axis=1).reindex(frames[0].index).reset_index()
 
     print("Cleaning and formatting final data...")
     final_df = merged_df.rename(columns=COLUMN_MAP)
     final_cols = list(COLUMN_MAP.values())
     
-    for col in final_cols:
-        if col not in final_df.columns:
-            final_df[col] = 0
-
-    final_df = final_df[[col for col in final_cols if col in final_df.columns]]
+    # One reindex adds any missing columns (filled with 0) and fixes the order
+    final_df = final_df.reindex(columns=final_cols, fill_value=0)
 
-    for col in final_df.columns:
-        if col not in ['name', 'position', 'team']:
-            final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(0).astype(int)
+    # Convert every stat column in one vectorized pass instead of per-column loops
+    numeric_cols = final_df.columns.difference(['name', 'position', 'team'])
+    final_df[numeric_cols] = (
+        final_df[numeric_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int32')
+    )
     
-    # Handle Fantrax-specific columns
+    # Handle Fantrax-specific columns in one reindex instead of per-column checks
     fantrax_specific_cols = ['cleanSheets', 'saves', 'pkSaves', 'highClaims', 'goalsConceded', 'handBalls', 'assistsSecond']
-    for col in fantrax_specific_cols:
-        if col not in final_df.columns: 
-            final_df[col] = 0
+    final_df = final_df.reindex(columns=final_df.columns.union(fantrax_specific_cols, sort=False), fill_value=0)
 
     # Calculate clean sheets if not available
     if 'cleanSheets' in final_df.columns and final_df['cleanSheets'].sum() == 0:
         final_df['cleanSheets'] = calculate_clean_sheets(dataframes["standard"])
 
-    # Handle position mapping
-    final_df['position'] = final_df['position'].str.split(',').str[0].str.slice(0, 2)
-    position_map = {'DF': 'D', 'MF': 'M', 'FW': 'F', 'GK': 'G'}
-    final_df['position'] = final_df['position'].map(position_map).fillna('M')
-
-    # Add missing Fantrax columns
-    if 'handBalls' not in final_df.columns:
-        final_df['handBalls'] = 0
-    if 'assistsSecond' not in final_df.columns:
-        final_df['assistsSecond'] = 0
+    # Handle position mapping: one vectorized pass over the first role code
+    # ("DF,MF" -> "DF" -> "D"), stored as a categorical instead of object strings
+    prefix = final_df['position'].str.slice(stop=2).to_numpy()
+    final_df['position'] = pd.Categorical(
+        np.select([prefix == 'DF', prefix == 'MF', prefix == 'FW', prefix == 'GK'],
+                  ['D', 'M', 'F', 'G'], default='M'),
+        categories=['G', 'D', 'M', 'F'], ordered=True
+    )
 
-    player_list = final_df.to_dict(orient='records')
-    for i, player in enumerate(player_list): 
-        player['id'] = str(i + 1)
+    # Build records straight from itertuples; skips pandas' per-row scalar
+    # boxing in to_dict(orient='records') and adds the id in the same pass
+    cols = final_df.columns.tolist()
+    player_list = [
+        dict(zip(cols, row), id=str(i + 1))
+        for i, row in enumerate(final_df.itertuples(index=False, name=None))
+    ]
 
     output_filename = "fpl-data-2024-2025.json"
-    with open(output_filename, 'w') as f:
-        json.dump(player_list, f, indent=4)
+    # Write to a temp file and os.replace so readers never see a half-written file
+    tmp_filename = output_filename + ".tmp"
+    if orjson is not None:
+        with open(tmp_filename, 'wb') as f:
+            f.write(orjson.dumps(player_list, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(tmp_filename, 'w') as f:
+            json.dump(player_list, f, indent=4, default=lambda v: v.item())
+    os.replace(tmp_filename, output_filename)
         
-    print(f"\n✅ Success! Full dataset saved to '{output_filename}'")
-    print(f"Total players processed: {len(player_list)}")
-    
-    # Print summary of key stats
-    print("\n📊 Data Summary:")
-    print(f"Clean Sheets: {final_df['cleanSheets'].sum()} total")
-    print(f"Saves: {final_df['saves'].sum()} total")
-    print(f"Goals Conceded: {final_df['goalsConceded'].sum()} total")
-    print(f"Penalty Saves: {final_df['pkSaves'].sum()} total")
+    # Print summary of key stats in one write instead of one syscall per line
+    print("\n".join([
+        f"\n✅ Success! Full dataset saved to '{output_filename}'",
+        f"Total players processed: {len(player_list)}",
+        "",
+        "📊 Data Summary:",
+        f"Clean Sheets: {final_df['cleanSheets'].sum()} total",
+        f"Saves: {final_df['saves'].sum()} total",
+        f"Goals Conceded: {final_df['goalsConceded'].sum()} total",
+        f"Penalty Saves: {final_df['pkSaves'].sum()} total",
+    ]))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file